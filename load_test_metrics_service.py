@@ -0,0 +1,145 @@
+"""Load test for metrics_service.py.
+
+Starts the metrics service in-process on a free port and reports requests/sec
+for uncached queries (every request parses the CSV and recomputes the
+metrics), cached queries (200 served from the content-hash cache) and
+conditional queries (304 via If-None-Match).
+
+    python load_test_metrics_service.py --trades 2000 --requests 500 --concurrency 8
+
+Pass --journal to test against one of your own CSV files instead of a
+generated one.
+"""
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from metrics_service import JournalStore, MetricsCache, ThreadPoolHTTPServer
+
+MARKETS = ['NQ', 'ES', 'YM', 'RTY', 'CL', 'GC']
+SETUPS = ['Breakout', 'Pullback', 'Reversal', 'Range']
+
+
+def write_sample_journal(path, trades, seed=0):
+    """Write a journal CSV in the same format as the Notion trading journal export"""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 2, 9, 30)
+    with open(path, 'w') as f:
+        f.write('Date (GMT+1),Market,Setup,P/L,W/L\n')
+        for i in range(trades):
+            date = start + timedelta(hours=7 * i)
+            # Built by hand: %-d / %-I are glibc-only and fail on Windows
+            date_text = f"{date:%B} {date.day}, {date.year} {date.hour % 12 or 12}:{date:%M %p}"
+            win = rng.random() < 0.55
+            pnl = rng.uniform(50, 900) if win else -rng.uniform(50, 600)
+            sign = '' if pnl >= 0 else '-'
+            f.write('"{} (GMT+1)",{},{},"{}${:,.2f}",{}\n'.format(
+                date_text,
+                rng.choice(MARKETS),
+                rng.choice(SETUPS),
+                sign, abs(pnl),
+                'W' if win else 'L',
+            ))
+
+
+def run_load(port, paths, requests, concurrency, etag=None):
+    """Issue requests from concurrent clients and return (requests/sec, statuses)
+
+    The service closes the connection after each response; http.client
+    reconnects on the next request.
+    """
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+    headers = {'If-None-Match': etag} if etag else {}
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker(count):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        seen = {}
+        try:
+            for i in range(count):
+                conn.request('GET', paths[i % len(paths)], headers=headers)
+                response = conn.getresponse()
+                response.read()
+                seen[response.status] = seen.get(response.status, 0) + 1
+        finally:
+            conn.close()
+        with lock:
+            for status, n in seen.items():
+                statuses[status] = statuses.get(status, 0) + n
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, per_worker))
+    elapsed = time.perf_counter() - started
+    return requests / elapsed, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure metrics service throughput')
+    parser.add_argument('--journal', help='Journal CSV to serve (default: generated sample)')
+    parser.add_argument('--trades', type=int, default=1000, help='Trades in the generated sample')
+    parser.add_argument('--requests', type=int, default=400, help='Requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client connections')
+    parser.add_argument('--workers', type=int, default=8, help='Server thread pool size')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='tradalytics-load-')
+    journal_path = os.path.join(directory, 'journal.csv')
+    if args.journal:
+        shutil.copyfile(args.journal, journal_path)
+    else:
+        write_sample_journal(journal_path, args.trades)
+
+    cache = MetricsCache()
+    store = JournalStore(directory, cache)
+    server = ThreadPoolHTTPServer(('127.0.0.1', 0), store, workers=args.workers, quiet=True)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    paths = [f'/journals/journal/{endpoint}' for endpoint in ('summary', 'markets', 'equity')]
+    try:
+        # Uncached: a zero-size cache evicts every entry as soon as it is stored
+        cache.max_entries = 0
+        uncached_rps, uncached_statuses = run_load(port, paths, args.requests, args.concurrency)
+
+        cache.max_entries = 256
+        run_load(port, paths, len(paths), 1)  # warm the cache
+        cached_rps, cached_statuses = run_load(port, paths, args.requests, args.concurrency)
+
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.request('GET', paths[0])
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader('ETag')
+        conn.close()
+        conditional_rps, conditional_statuses = run_load(
+            port, paths, args.requests, args.concurrency, etag=etag)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"Journal: {args.journal or f'generated, {args.trades} trades'}")
+    print(f"Requests per scenario: {args.requests}, concurrency: {args.concurrency}, "
+          f"server workers: {args.workers}")
+    print(f"{'scenario':<14}{'req/s':>10}  statuses")
+    for name, rps, statuses in [
+        ('uncached', uncached_rps, uncached_statuses),
+        ('cached', cached_rps, cached_statuses),
+        ('if-none-match', conditional_rps, conditional_statuses),
+    ]:
+        print(f"{name:<14}{rps:>10.1f}  {dict(sorted(statuses.items()))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Measure the cold import time of tradalytics_core.
+
+Each run imports the module in a fresh interpreter, so nothing is cached in
+sys.modules. The core cannot load faster than pandas, so pandas is timed on
+its own and the core overhead is timed in an interpreter where numpy and
+pandas are already loaded.
+
+    python measure_import_time.py --runs 5 --max-overhead 0.05
+
+Exits with status 1 if streamlit or plotly get imported, or if the time spent
+on top of pandas exceeds --max-overhead seconds.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ('streamlit', 'plotly')
+
+TIMING_SCRIPT = '''
+import sys, time
+{preload}
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, ','.join(loaded))
+'''
+
+
+def time_import(module, preload=()):
+    """Return (seconds, heavy modules loaded) for importing a module in a fresh interpreter"""
+    script = TIMING_SCRIPT.format(
+        module=module,
+        heavy=HEAVY_MODULES,
+        preload='\n'.join(f'import {name}' for name in preload),
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold import time of tradalytics_core')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--max-overhead', type=float, default=0.05,
+                        help='Allowed seconds on top of importing pandas')
+    args = parser.parse_args()
+
+    baseline = min(time_import('pandas')[0] for _ in range(args.runs))
+    core = min(time_import('tradalytics_core')[0] for _ in range(args.runs))
+    overhead_runs = [time_import('tradalytics_core', preload=('numpy', 'pandas'))
+                     for _ in range(args.runs)]
+    overhead = min(seconds for seconds, _ in overhead_runs)
+    heavy = sorted({name for _, loaded in overhead_runs for name in loaded})
+
+    print(f"import pandas            {baseline * 1000:8.1f} ms (best of {args.runs})")
+    print(f"import tradalytics_core  {core * 1000:8.1f} ms (best of {args.runs})")
+    print(f"core overhead            {overhead * 1000:8.1f} ms (pandas already loaded)")
+    print(f"heavy modules loaded     {', '.join(heavy) if heavy else 'none'}")
+
+    if heavy:
+        print(f"FAIL: tradalytics_core imported {', '.join(heavy)}")
+        sys.exit(1)
+    if overhead > args.max_overhead:
+        print(f"FAIL: core overhead above {args.max_overhead * 1000:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""Local HTTP/JSON service exposing Tradalytics metrics for stored journals.
+
+Run with:
+
+    python metrics_service.py --journals ./journals --port 8502
+
+Every CSV in the journals directory is served under its file name (without
+the .csv extension):
+
+    GET /journals                     list of stored journals
+    GET /journals/<name>/summary      summary block metrics
+    GET /journals/<name>/markets      wins, losses and P&L per market
+    GET /journals/<name>/equity       equity and drawdown per trade
+
+Results are cached by the SHA-256 of the journal file contents, which is also
+used as the ETag, so clients sending If-None-Match get a 304 when the journal
+has not changed.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import BytesIO
+from urllib.parse import unquote, urlsplit
+
+import pandas as pd
+
+from tradalytics_core import analyze_journal, equity_series, market_stats, summary_stats
+
+ENDPOINTS = ('summary', 'markets', 'equity')
+
+
+def to_json_value(value):
+    """Convert numpy/pandas scalars to plain JSON values (NaN becomes null)"""
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def summary_payload(df):
+    return {key: to_json_value(value) for key, value in summary_stats(df).items()}
+
+
+def markets_payload(df):
+    by_market = market_stats(df).sort_values('P/L', ascending=False)
+    return [
+        {
+            'market': market,
+            'wins': to_json_value(wins),
+            'losses': to_json_value(losses),
+            'pnl': to_json_value(pnl),
+        }
+        for market, wins, losses, pnl in zip(
+            by_market.index, by_market['Wins'], by_market['Losses'], by_market['P/L'])
+    ]
+
+
+def equity_payload(df):
+    df_sorted = equity_series(df)
+    columns = zip(df_sorted['Date'], df_sorted['P/L'], df_sorted['Equity'],
+                  df_sorted['Drawdown'], df_sorted['Drawdown %'])
+    return [
+        {
+            'trade': i + 1,
+            'date': to_json_value(date),
+            'pnl': to_json_value(pnl),
+            'equity': to_json_value(equity),
+            'drawdown': to_json_value(drawdown),
+            'drawdown_pct': to_json_value(drawdown_pct),
+        }
+        for i, (date, pnl, equity, drawdown, drawdown_pct) in enumerate(columns)
+    ]
+
+
+PAYLOADS = {
+    'summary': summary_payload,
+    'markets': markets_payload,
+    'equity': equity_payload,
+}
+
+
+class MetricsCache:
+    """Thread-safe LRU of encoded responses keyed by (content hash, endpoint)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class JournalStore:
+    """Stored journals (CSV files) in a directory plus their computed metrics"""
+
+    def __init__(self, directory, cache=None):
+        self.directory = os.path.abspath(directory)
+        self.cache = cache if cache is not None else MetricsCache()
+
+    def names(self):
+        return sorted(
+            os.path.splitext(name)[0]
+            for name in os.listdir(self.directory)
+            if name.lower().endswith('.csv')
+        )
+
+    def read(self, name):
+        """Return the raw bytes of a stored journal, or None if it does not exist"""
+        if not name or name != os.path.basename(name) or name.startswith('.'):
+            return None
+        path = os.path.join(self.directory, name + '.csv')
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            return None
+
+    def metrics(self, content, endpoint, digest=None):
+        """Return (etag, body) for an endpoint, computing it only on a cache miss"""
+        digest = digest or hashlib.sha256(content).hexdigest()
+        key = (digest, endpoint)
+        body = self.cache.get(key)
+        if body is None:
+            df = analyze_journal(pd.read_csv(BytesIO(content)))
+            body = json.dumps(PAYLOADS[endpoint](df)).encode('utf-8')
+            self.cache.put(key, body)
+        return f'"{digest}"', body
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'TradalyticsMetrics/1.0'
+    # HTTP/1.0: close the connection after each response so an idle keep-alive
+    # client never holds a pool worker
+    protocol_version = 'HTTP/1.0'
+    # Give up on clients that connect but are slow to send their request
+    timeout = 5
+    # Headers and body go out in separate writes; avoid the Nagle/delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parts = [unquote(part) for part in urlsplit(self.path).path.split('/') if part]
+        store = self.server.store
+
+        if parts == ['journals']:
+            try:
+                names = store.names()
+            except OSError as e:
+                self.send_error_json(HTTPStatus.INTERNAL_SERVER_ERROR, f'Error listing journals: {e}')
+                return
+            self.send_json(HTTPStatus.OK, json.dumps(names).encode('utf-8'))
+            return
+
+        if len(parts) != 3 or parts[0] != 'journals' or parts[2] not in ENDPOINTS:
+            self.send_error_json(HTTPStatus.NOT_FOUND, 'Unknown endpoint')
+            return
+
+        content = store.read(parts[1])
+        if content is None:
+            self.send_error_json(HTTPStatus.NOT_FOUND, f'Journal not found: {parts[1]}')
+            return
+
+        # Answer conditional requests before doing any metric work
+        digest = hashlib.sha256(content).hexdigest()
+        etag = f'"{digest}"'
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        try:
+            etag, body = store.metrics(content, parts[2], digest)
+        except Exception as e:
+            self.send_error_json(HTTPStatus.UNPROCESSABLE_ENTITY, f'Error reading journal: {e}')
+            return
+        self.send_json(HTTPStatus.OK, body, etag)
+
+    def send_json(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status, message):
+        self.send_json(status, json.dumps({'error': message}).encode('utf-8'))
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """HTTPServer that handles each request on a fixed-size thread pool"""
+
+    # Every request opens a new connection, so allow more than the default 5
+    # pending connects before the kernel starts dropping them
+    request_queue_size = 128
+
+    def __init__(self, server_address, store, workers=8, quiet=False):
+        super().__init__(server_address, MetricsRequestHandler)
+        self.store = store
+        self.quiet = quiet
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='metrics')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve Tradalytics metrics as JSON')
+    parser.add_argument('--journals', default='.', help='Directory containing journal CSV files')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--workers', type=int, default=8, help='Size of the request thread pool')
+    parser.add_argument('--quiet', action='store_true', help='Do not log each request')
+    args = parser.parse_args()
+    if not os.path.isdir(args.journals):
+        parser.error(f"--journals is not a directory: {args.journals}")
+
+    server = ThreadPoolHTTPServer((args.host, args.port), JournalStore(args.journals),
+                                  workers=args.workers, quiet=args.quiet)
+    print(f"Serving metrics for {server.store.directory} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,433 @@
+"""Journal cleaning, metrics and charts shared by the Streamlit app and the metrics service.
+
+Only numpy and pandas are imported here. Plotly is imported when a figure is
+requested, and streamlit is never imported, so this module is cheap to load in
+scripts, workers and tests.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Starting balance used for the equity curve
+INITIAL_EQUITY = 2000
+
+
+def format_currency_compact(value):
+    abs_value = abs(value)
+    if abs_value >= 1_000_000:
+        return f"${value/1_000_000:.1f}M"
+    elif abs_value >= 1_000:
+        return f"${value/1_000:.0f}k"
+    else:
+        return f"${int(value)}"
+
+
+def clean_journal(df):
+    """Return a cleaned copy of the journal with parsed dates, numeric P/L and stripped W/L"""
+    df = df.copy()
+
+    # Find date column (flexible detection)
+    date_columns = [col for col in df.columns if 'date' in col.lower() or 'time' in col.lower()]
+    if date_columns:
+        date_col = date_columns[0]  # Use the first date column found
+    else:
+        date_col = 'Date (GMT+1)'  # Fallback to original column name
+
+    df['Date'] = pd.to_datetime(
+        df[date_col].str.replace(r' \(GMT\+1\)', '', regex=True),
+        errors='coerce',
+        format="%B %d, %Y %I:%M %p"  # Matches 'June 4, 2025 9:41 PM' after removing timezone
+    )
+    df = df.sort_values('Date')
+    df['P/L'] = df['P/L'].replace({r'\$': '', ',': ''}, regex=True).astype(float)
+    df['W/L'] = df['W/L'].str.strip()
+    return df
+
+
+def add_equity(df, initial_equity=INITIAL_EQUITY):
+    """Add Equity, Running Max and Drawdown columns to a cleaned journal"""
+    df['Equity'] = initial_equity + df['P/L'].cumsum()
+    df['Running Max'] = df['Equity'].expanding().max()
+    df['Drawdown'] = df['Equity'] - df['Running Max']
+    return df
+
+
+def equity_series(df):
+    """Return the journal sorted by date with DateShort, Drawdown % and cumulative W/L columns"""
+    df_sorted = df.sort_values('Date').reset_index(drop=True)
+    df_sorted['DateShort'] = df_sorted['Date'].dt.strftime('%B %d')
+    df_sorted['Drawdown %'] = (df_sorted['Drawdown'] / df_sorted['Running Max']) * 100
+    df_sorted['Cumulative Wins'] = (df_sorted['W/L'] == 'W').cumsum()
+    df_sorted['Cumulative Losses'] = (df_sorted['W/L'] == 'L').cumsum()
+    return df_sorted
+
+
+def calculate_streaks(series):
+    """Return (value, length) pairs for each run of equal values in the series"""
+    if series.empty:
+        return []
+
+    streaks = []
+    current_streak = 1
+    current_value = series.iloc[0]
+
+    for value in series.iloc[1:]:
+        if value == current_value:
+            current_streak += 1
+        else:
+            streaks.append((current_value, current_streak))
+            current_streak = 1
+            current_value = value
+
+    # Add the last streak
+    streaks.append((current_value, current_streak))
+    return streaks
+
+
+def calculate_recovery_periods(drawdown):
+    """Return the number of trades each drawdown took to get back to 0"""
+    recovery_periods = []
+    current_drawdown_start = None
+    for i, value in enumerate(drawdown):
+        if value < 0 and current_drawdown_start is None:
+            current_drawdown_start = i
+        elif value >= 0 and current_drawdown_start is not None:
+            recovery_periods.append(i - current_drawdown_start)
+            current_drawdown_start = None
+    return recovery_periods
+
+
+def market_stats(df):
+    """Return wins, losses and total P/L per market"""
+    return df.groupby('Market').agg(
+        Wins=('W/L', lambda x: (x == 'W').sum()),
+        Losses=('W/L', lambda x: (x == 'L').sum()),
+        PnL=('P/L', 'sum'),
+    ).rename(columns={'PnL': 'P/L'})
+
+
+def setup_pnl_stats(df):
+    """Return total P/L per setup, leaving out setups between -400 and 400 (inclusive)"""
+    setup_pnl = df.groupby('Setup')['P/L'].sum().sort_values(ascending=False)
+    return setup_pnl[(setup_pnl < -400) | (setup_pnl > 400)]
+
+
+def summary_stats(df):
+    """Return the summary block metrics for a journal prepared with add_equity"""
+    wins = (df['W/L'] == 'W').sum()
+    losses = (df['W/L'] == 'L').sum()
+    total_trades = wins + losses
+    win_pct = (wins / total_trades * 100) if total_trades > 0 else 0
+    loss_pct = (losses / total_trades * 100) if total_trades > 0 else 0
+    avg_win = df.loc[df['W/L'] == 'W', 'P/L'].mean() if wins > 0 else 0
+    avg_loss = df.loc[df['W/L'] == 'L', 'P/L'].mean() if losses > 0 else 0
+
+    # Profit factor
+    gross_profit = df.loc[df['P/L'] > 0, 'P/L'].sum()
+    gross_loss = abs(df.loc[df['P/L'] < 0, 'P/L'].sum())
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+
+    # Risk-reward
+    avg_win_abs = abs(avg_win) if avg_win else 0
+    avg_loss_abs = abs(avg_loss) if avg_loss else 0
+    risk_reward_ratio = avg_win_abs / avg_loss_abs if avg_loss_abs > 0 else 0
+
+    # Average trades per day
+    trades_per_day = df.groupby(df['Date'].dt.date).size()
+    avg_trades_per_day = trades_per_day.mean() if len(trades_per_day) > 0 else 0
+
+    # Fallback calculation if the above doesn't work
+    if avg_trades_per_day == 0 or pd.isna(avg_trades_per_day):
+        # Calculate total trades divided by number of unique trading days
+        unique_days = df['Date'].dt.date.nunique()
+        avg_trades_per_day = len(df) / unique_days if unique_days > 0 else 0
+
+    # Win and loss streaks
+    streaks = calculate_streaks((df['W/L'] == 'W').astype(int))
+    win_streaks = [length for value, length in streaks if value == 1]
+    loss_streaks = [length for value, length in streaks if value == 0]
+    highest_win_streak = max(win_streaks) if win_streaks else 0
+    highest_loss_streak = max(loss_streaks) if loss_streaks else 0
+
+    # Highest win and loss
+    highest_win = df.loc[df['W/L'] == 'W', 'P/L'].max() if wins > 0 else 0
+    highest_loss = df.loc[df['W/L'] == 'L', 'P/L'].min() if losses > 0 else 0
+
+    # Best market and expectancy
+    best_market_row = df.groupby('Market')["P/L"].sum().sort_values(ascending=False).head(1)
+    best_market = best_market_row.index[0] if not best_market_row.empty else "-"
+    expectancy = (win_pct * avg_win + loss_pct * avg_loss) / 100 if total_trades > 0 else 0
+
+    # Drawdown and recovery
+    df_sorted = equity_series(df)
+    recovery_periods = calculate_recovery_periods(df_sorted['Drawdown'])
+    avg_recovery_period = sum(recovery_periods) / len(recovery_periods) if recovery_periods else 0
+
+    return {
+        'wins': wins,
+        'losses': losses,
+        'total_trades': total_trades,
+        'win_pct': win_pct,
+        'loss_pct': loss_pct,
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'profit_factor': profit_factor,
+        'risk_reward_ratio': risk_reward_ratio,
+        'avg_trades_per_day': avg_trades_per_day,
+        'highest_win_streak': highest_win_streak,
+        'highest_loss_streak': highest_loss_streak,
+        'highest_win': highest_win,
+        'highest_loss': highest_loss,
+        'best_market': best_market,
+        'expectancy': expectancy,
+        'total_pnl': df['P/L'].sum(),
+        'max_drawdown': df['Drawdown'].min(),
+        'max_drawdown_pct': df_sorted['Drawdown %'].min(),
+        'avg_drawdown': df_sorted['Drawdown'].mean(),
+        'avg_drawdown_pct': df_sorted['Drawdown %'].mean(),
+        'avg_recovery_period': avg_recovery_period,
+    }
+
+
+def analyze_journal(df, initial_equity=INITIAL_EQUITY):
+    """Clean a raw journal and add the equity columns used by every metric"""
+    return add_equity(clean_journal(df), initial_equity)
+
+
+def wins_losses_by_market_figure(df):
+    """Stacked bar chart of wins and losses per market"""
+    import plotly.graph_objects as go
+
+    by_market = market_stats(df)
+    wl_by_market = by_market.sort_values('Wins', ascending=False)
+    markets = wl_by_market.index.tolist()
+    fig_bar = go.Figure()
+    fig_bar.add_trace(go.Bar(
+        x=markets,
+        y=wl_by_market['Wins'],
+        name='Wins',
+        marker_color='#3CB371',  # medium sea green
+        hovertemplate='%{y} wins<extra></extra>'
+    ))
+    fig_bar.add_trace(go.Bar(
+        x=markets,
+        y=wl_by_market['Losses'],
+        name='Losses',
+        marker_color='#ff4b5c',  # red
+        hovertemplate='%{y} losses<extra></extra>'
+    ))
+    fig_bar.update_layout(
+        barmode='stack',
+        xaxis_title='',
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        bargap=0.6,  # makes bars thinner
+        showlegend=False,
+        hoverlabel=dict(font_size=15),
+    )
+    fig_bar.update_yaxes(separatethousands=True)
+    fig_bar.update_xaxes(showticklabels=True, tickfont=dict(size=14))  # show labels and make them bigger
+    return fig_bar
+
+
+def pnl_by_market_figure(df):
+    """Bar chart of total P&L per market"""
+    import plotly.graph_objects as go
+
+    by_market = market_stats(df)
+    pnl_by_market_bar = by_market['P/L'].reset_index()
+    pnl_by_market_bar = pnl_by_market_bar.sort_values('P/L', ascending=False)
+    bar_colors_market = [
+        '#3CB371' if v >= 0 else '#ff4b5c' for v in pnl_by_market_bar['P/L']
+    ]
+    fig_market_bar = go.Figure()
+    fig_market_bar.add_trace(go.Bar(
+        x=pnl_by_market_bar['Market'],
+        y=pnl_by_market_bar['P/L'],
+        marker_color=bar_colors_market,
+        hovertemplate='$%{y:,.0f}<extra></extra>'
+    ))
+    fig_market_bar.update_layout(
+        xaxis_title='',
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=600,
+        showlegend=False,
+        bargap=0.6,  # makes bars thinner
+        hoverlabel=dict(font_size=15),
+    )
+    fig_market_bar.update_xaxes(showticklabels=True, tickfont=dict(size=14))  # show labels and make them bigger
+    fig_market_bar.update_yaxes(tickprefix="$", separatethousands=True, zeroline=True, tickformat=",.0f")
+    return fig_market_bar
+
+
+def pnl_by_setup_figure(df):
+    """Bar chart of total P&L per setup"""
+    import plotly.graph_objects as go
+
+    setup_pnl = setup_pnl_stats(df)
+    # Set bar colors: green for positive, red for negative
+    bar_colors_setup = ['#3CB371' if v > 0 else '#ff4b5c' for v in setup_pnl.values]
+    fig_setup = go.Figure([go.Bar(x=setup_pnl.index, y=setup_pnl.values, marker_color=bar_colors_setup)])
+    fig_setup.update_layout(
+        xaxis_title='',
+        yaxis_title='',
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        showlegend=False,
+        bargap=0.6,
+        hoverlabel=dict(font_size=15),
+    )
+    fig_setup.update_xaxes(showticklabels=True, tickfont=dict(size=14))
+    fig_setup.update_yaxes(tickprefix="$", separatethousands=True, zeroline=True, tickformat=",.0f")
+    return fig_setup
+
+
+def pnl_per_trade_figure(df):
+    """Line chart of the P&L of each trade"""
+    import plotly.graph_objects as go
+
+    fig_pnl = go.Figure()
+    fig_pnl.add_trace(go.Scatter(
+        x=list(range(1, len(df['P/L'])+1)),
+        y=df['P/L'],
+        mode='lines',
+        name='P&L per Trade',
+        line=dict(color='white', width=2, shape='spline', smoothing=1.3),
+        customdata=np.stack([df['Date'].dt.strftime('%B %d'), [i+1 for i in range(len(df))]], axis=-1),
+        hovertemplate='<b>Date:</b> %{customdata[0]}<br><b>Trade # %{customdata[1]}</b><br>P&L: $%{y:,.0f}<extra></extra>'
+    ))
+    fig_pnl.add_shape(type="line", x0=1, x1=len(df['P/L']), y0=0, y1=0, line=dict(color="white", width=1.5, dash="dash"))
+    fig_pnl.update_layout(
+        xaxis_title='',
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        showlegend=False,
+        hoverlabel=dict(font_size=15),
+    )
+    fig_pnl.update_yaxes(tickprefix="$", separatethousands=True)
+    return fig_pnl
+
+
+def equity_curve_figure(df_sorted):
+    """Equity curve for a journal prepared with equity_series"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=list(range(1, len(df_sorted)+1)),
+        y=df_sorted['Equity'],
+        mode='lines',
+        name='Equity Curve',
+        line=dict(color='#90EE90', width=2),  # light green line
+        fill='tonexty',
+        fillcolor='rgba(144, 238, 144, 0.2)',  # more transparent light green fill
+        customdata=np.stack([df_sorted['DateShort'], df_sorted['Trade #']], axis=-1),
+        hovertemplate='<b>Date:</b> %{customdata[0]}<br><b>Trade # %{customdata[1]}</b><br><b>Equity:</b> $%{y:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        xaxis_title='',  # Remove Trade # label
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        showlegend=False,
+        hoverlabel=dict(font_size=15),
+    )
+    fig.update_yaxes(tickprefix="$", separatethousands=True)
+    return fig
+
+
+def cumulative_wl_figure(df_sorted):
+    """Cumulative wins and losses for a journal prepared with equity_series"""
+    import plotly.graph_objects as go
+
+    trade_numbers = list(range(1, len(df_sorted) + 1))
+    customdata = np.stack([df_sorted['DateShort'], df_sorted['Trade #']], axis=-1)
+    fig_cum = go.Figure()
+    fig_cum.add_trace(go.Scatter(
+        x=trade_numbers,
+        y=df_sorted['Cumulative Wins'],
+        mode='lines',
+        name='Cumulative Wins',
+        line=dict(color='#3fffa8', width=2, shape='spline', smoothing=1.3),
+        customdata=customdata,
+        hovertemplate='<b>Date:</b> %{customdata[0]}<br><b>Trade # %{customdata[1]}</b><br><b>Wins:</b> %{y}<extra></extra>'
+    ))
+    fig_cum.add_trace(go.Scatter(
+        x=trade_numbers,
+        y=df_sorted['Cumulative Losses'],
+        mode='lines',
+        name='Cumulative Losses',
+        line=dict(color='#ff4b5c', width=2, shape='spline', smoothing=1.3),
+        customdata=customdata,
+        hovertemplate='<b>Date:</b> %{customdata[0]}<br><b>Trade # %{customdata[1]}</b><br><b>Losses:</b> %{y}<extra></extra>'
+    ))
+    fig_cum.update_layout(
+        xaxis_title='',
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        showlegend=False,  # Hide the legend
+        hoverlabel=dict(font_size=15),
+    )
+    return fig_cum
+
+
+def drawdown_figure(df_sorted):
+    """Drawdown % chart for a journal prepared with equity_series"""
+    import plotly.graph_objects as go
+
+    fig_drawdown = go.Figure()
+    fig_drawdown.add_trace(go.Scatter(
+        x=list(range(1, len(df_sorted)+1)),
+        y=df_sorted['Drawdown %'],
+        mode='lines',
+        name='Drawdown %',
+        line=dict(color='#ff4b5c', width=2, shape='spline', smoothing=1.3),
+        fill='tonexty',
+        fillcolor='rgba(255, 75, 92, 0.3)',
+        customdata=np.stack([df_sorted['DateShort'], [i+1 for i in range(len(df_sorted))], df_sorted['Drawdown']], axis=-1),
+        hovertemplate='<b>Date:</b> %{customdata[0]}<br><b>Trade # %{customdata[1]}</b><br>Drawdown: $%{customdata[2]:,.0f}<extra></extra>'
+    ))
+    fig_drawdown.update_layout(
+        xaxis_title='',  # Remove Trade # label
+        yaxis_title='',  # Remove y-axis label
+        template='plotly_dark',
+        plot_bgcolor='#181818',
+        paper_bgcolor='#181818',
+        font=dict(color='#e0e0e0'),
+        margin=dict(l=40, r=40, t=60, b=40),
+        height=500,
+        showlegend=False,
+        hoverlabel=dict(font_size=15),
+    )
+    fig_drawdown.update_yaxes(tickformat=".1f", ticksuffix="%")
+    return fig_drawdown